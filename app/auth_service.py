@@ -1,18 +1,94 @@
 # auth_utils.py
+import asyncio
+import hashlib
 import jwt
+import threading
+import time
 from datetime import datetime, timedelta
-import requests
+import httpx
+from cachetools import TTLCache
 from fastapi import HTTPException, status
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from typing import Optional
 from config import get_settings
+from metrics import TIMER
 
 # Initialize settings
 settings = get_settings()
 
+# Signing key and algorithm list, built once instead of on every encode/decode
+_JWT_KEY = settings.SECRET_KEY.encode()
+_JWT_ALGS = [settings.ALGORITHM]
+
+# Successfully decoded tokens, keyed by the raw token string
+_jwt_cache = TTLCache(maxsize=4096, ttl=60)
+_jwt_cache_lock = threading.Lock()
+
+# Recently verified Plymouth logins, keyed by a hash of email and password.
+# Only successful verifications are stored, never the password itself.
+_cred_cache = TTLCache(maxsize=2048, ttl=60)
+_cred_cache_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Fail fast once a remote service has failed too many times in a row.
+
+    Closed: calls go through. Open: calls are rejected for reset_timeout.
+    Half-open: once reset_timeout has passed, a single probe call is let
+    through; its success closes the breaker, its failure re-opens it.
+    """
+
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls should be rejected without trying the service"""
+        if self._opened_at is None:
+            return False
+        now = time.monotonic()
+        if self._probe_started_at is not None:
+            # Half-open with a probe in flight; give up on it after reset_timeout
+            # so a probe that never reports back cannot wedge the breaker
+            return now - self._probe_started_at < self.reset_timeout
+        return now - self._opened_at < self.reset_timeout
+
+    def allow_request(self) -> bool:
+        """Claim the right to make a call, taking the single probe slot when half-open"""
+        if self.is_open:
+            return False
+        if self._opened_at is not None:
+            self._probe_started_at = time.monotonic()
+        return True
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._probe_started_at is not None or self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
+            self._probe_started_at = None
+
+
+# Isolation for the Plymouth auth API: stop calling it while it is failing,
+# and cap how many logins can be waiting on it at once
+plymouth_breaker = CircuitBreaker(fail_max=5, reset_timeout=30)
+_plymouth_bulkhead = asyncio.Semaphore(20)
+
 
 class AuthUtils:
     AUTH_API_URL = settings.PLYMOUTH_AUTH_URL
 
+    # Shared HTTP client, opened and closed with the application
+    _client: Optional[httpx.AsyncClient] = None
+
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         """Create JWT token for authenticated user"""
@@ -23,30 +99,71 @@ class AuthUtils:
             expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=settings.ALGORITHM)
         return encoded_jwt
 
+    @staticmethod
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_random_exponential(min=0.1, max=2),
+        retry=retry_if_exception_type(httpx.TransportError),
+        reraise=True
+    )
+    async def _post_credentials(email: str, password: str) -> httpx.Response:
+        """POST credentials to Plymouth, retrying transient transport errors only"""
+        return await AuthUtils._client.post(
+            f"{AuthUtils.AUTH_API_URL}",
+            json={
+                "email": email,
+                "password": password
+            }
+        )
+
     @staticmethod
     async def verify_plymouth_credentials(email: str, password: str) -> bool:
         """Verify credentials against Plymouth's authentication service"""
+        key = hashlib.sha256(f"{email}\x00{password}".encode()).digest()
+        with _cred_cache_lock:
+            if key in _cred_cache:
+                return True
+
+        unavailable_exception = HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is temporarily unavailable"
+        )
+
+        # Reject early so callers do not queue on the bulkhead while open
+        if plymouth_breaker.is_open:
+            raise unavailable_exception
+
         try:
             # Make the request
-            response = requests.post(
-                f"{AuthUtils.AUTH_API_URL}",
-                json={
-                    "email": email,
-                    "password": password
-                }
-            )
+            async with _plymouth_bulkhead:
+                # Check again once admitted: the breaker may have opened while
+                # this call was queued, and half-open only lets one probe through
+                if not plymouth_breaker.allow_request():
+                    raise unavailable_exception
+
+                with TIMER.labels("plymouth_verify").time():
+                    response = await AuthUtils._post_credentials(email, password)
+
+            if response.status_code >= 500:
+                plymouth_breaker.record_failure()
+            else:
+                plymouth_breaker.record_success()
 
             # Check if response is successful and contains verification
             if response.status_code == 200:
                 result = response.json()
-                return result == ["Verified", "True"]
+                if result == ["Verified", "True"]:
+                    with _cred_cache_lock:
+                        _cred_cache[key] = True
+                    return True
 
             return False
 
-        except requests.RequestException as e:
+        except httpx.RequestError as e:
+            plymouth_breaker.record_failure()
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Could not connect to authentication service"
@@ -56,8 +173,26 @@ class AuthUtils:
     @staticmethod
     def decode_token(token: str) -> dict:
         """Decode and verify JWT token"""
+        with _jwt_cache_lock:
+            cached = _jwt_cache.get(token)
+        if cached is not None:
+            payload, exp = cached
+            if time.time() < exp:
+                return payload
+            # Token expired while cached, drop it and let jwt.decode reject it
+            with _jwt_cache_lock:
+                _jwt_cache.pop(token, None)
+
         try:
-            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            with TIMER.labels("jwt_decode").time():
+                payload = jwt.decode(
+                    token,
+                    _JWT_KEY,
+                    algorithms=_JWT_ALGS,
+                    options={"require": ["exp", "sub"]}
+                )
+            with _jwt_cache_lock:
+                _jwt_cache[token] = (payload, payload["exp"])
             return payload
         except jwt.ExpiredSignatureError:
             raise HTTPException(
@@ -1,4 +1,4 @@
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import List
 from pydantic_settings import BaseSettings
 import os
@@ -36,7 +36,7 @@ class Settings(BaseSettings):
     # Plymouth Auth Service
     PLYMOUTH_AUTH_URL: str = "https://web.socem.plymouth.ac.uk/COMP2001/auth/api/users"
 
-    @property
+    @cached_property
     def DATABASE_URL(self) -> str:
         """Generate database connection string based on configuration"""
         if self.DB_TRUSTED_CONNECTION:
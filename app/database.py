@@ -0,0 +1,40 @@
+# database.py
+import time
+import urllib.parse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from config import get_settings
+from metrics import TIMER
+
+# Initialize settings
+settings = get_settings()
+
+# Pooled async engine shared by all requests, so queries are awaited on the
+# event loop instead of blocking it, and connections are reused across requests
+engine = create_async_engine(
+    f"mssql+aioodbc:///?odbc_connect={urllib.parse.quote_plus(settings.DATABASE_URL)}",
+    pool_size=10,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=3600
+)
+
+async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+
+# Time every statement sent to SQL Server. The start time lives on the
+# per-execution context, so statements that raise leave nothing behind.
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    TIMER.labels("db_execute").observe(time.perf_counter() - context._query_start_time)
+
+
+async def get_db():
+    """Yield an async session, returning its connection to the pool afterwards"""
+    async with async_session_maker() as session:
+        yield session
@@ -1,13 +1,19 @@
 # main.py
 from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-import pyodbc
-from typing import List, Optional
+from typing import List, NoReturn, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
 import logging
+import httpx
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_fastapi_instrumentator import Instrumentator
 from config import get_settings
+from database import async_session_maker, engine, get_db
 
 from auth_service import AuthUtils
 from user_service import UserService
@@ -29,7 +35,8 @@ def create_app() -> FastAPI:
     app_ = FastAPI(
         title="Trail Service API",
         description="API for managing hiking trails and user associations",
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=ORJSONResponse
     )
 
     # Configure CORS
@@ -41,6 +48,23 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Request metrics, served at /metrics
+    Instrumentator().instrument(app_).expose(app_)
+
+    @app_.on_event("startup")
+    async def startup():
+        AuthUtils._client = httpx.AsyncClient(
+            timeout=5.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40)
+        )
+
+    @app_.on_event("shutdown")
+    async def shutdown():
+        if AuthUtils._client is not None:
+            await AuthUtils._client.aclose()
+            AuthUtils._client = None
+        await engine.dispose()
+
     return app_
 
 
@@ -67,15 +91,33 @@ class Trail(TrailBase):
         orm_mode = True
 
 
-# Database connection
-def get_db():
-    conn = None
-    try:
-        conn = pyodbc.connect(settings.DATABASE_URL)
-        yield conn
-    finally:
-        if conn:
-            conn.close()
+# Result helpers, reading the column names once per result instead of per row
+def rows_to_dicts(result) -> List[dict]:
+    """Convert every remaining row of a result to a dict"""
+    columns = tuple(result.keys())
+    return [dict(zip(columns, row)) for row in result.fetchall()]
+
+
+def row_to_dict(result) -> Optional[dict]:
+    """Convert the next row of a result to a dict, or None if there is none"""
+    row = result.fetchone()
+    return None if row is None else dict(zip(result.keys(), row))
+
+
+# Error number and THROW text used by CW1.UpdateTrail/CW1.DeleteTrail, either of
+# which identifies the error however the ODBC driver formats its message
+TRAIL_NOT_FOUND_ERROR = ("(50404)", "Trail not found")
+TRAIL_NOT_OWNER_ERROR = ("(50403)", "Not authorized to modify this trail")
+
+
+def raise_for_trail_error(error: DBAPIError, action: str) -> NoReturn:
+    """Map the not-found/not-owner errors thrown by the trail procedures to HTTP errors"""
+    message = str(error.orig)
+    if any(marker in message for marker in TRAIL_NOT_FOUND_ERROR):
+        raise HTTPException(status_code=404, detail="Trail not found")
+    if any(marker in message for marker in TRAIL_NOT_OWNER_ERROR):
+        raise HTTPException(status_code=403, detail=f"Not authorized to {action} this trail")
+    raise error
 
 
 # Auth middleware
@@ -86,7 +128,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 @app.post("/token")
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
-        db: pyodbc.Connection = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """
     Login endpoint that:
@@ -139,10 +181,7 @@ async def login(
         )
 
 
-async def get_current_user(
-        token: str = Depends(oauth2_scheme),
-        db: pyodbc.Connection = Depends(get_db)
-):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Get current user from token and ensure they exist in database"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -156,7 +195,11 @@ async def get_current_user(
         if email is None:
             raise credentials_exception
 
-        user = await UserService.get_user_by_email(db, email)
+        # Only check out a DB connection when the user is not cached
+        user = UserService.get_cached_user(email)
+        if user is None:
+            async with async_session_maker() as db:
+                user = await UserService.get_user_by_email(db, email)
         if user is None:
             raise credentials_exception
 
@@ -185,51 +228,52 @@ async def protected_route(current_user: dict = Depends(get_current_user)):
 
 # API Routes
 @app.get("/api/trails", response_model=List[Trail])
-async def get_trails(db: pyodbc.Connection = Depends(get_db)):
+async def get_trails(db: AsyncSession = Depends(get_db)):
     """Get all trails (public view)"""
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM CW1.Trail")
-    trails = cursor.fetchall()
-    return [dict(zip([column[0] for column in cursor.description], trail)) for trail in trails]
+    result = await db.execute(text("SELECT * FROM CW1.Trail"))
+    return rows_to_dicts(result)
 
 
 @app.get("/api/trails/{trail_id}", response_model=Trail)
-async def get_trail(trail_id: int, db: pyodbc.Connection = Depends(get_db)):
+async def get_trail(trail_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific trail by ID"""
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM CW1.Trail WHERE TrailID = ?", trail_id)
-    trail = cursor.fetchone()
+    result = await db.execute(
+        text("SELECT * FROM CW1.Trail WHERE TrailID = :trail_id"),
+        {"trail_id": trail_id}
+    )
+    trail = row_to_dict(result)
 
     if trail is None:
         raise HTTPException(status_code=404, detail="Trail not found")
 
-    return dict(zip([column[0] for column in cursor.description], trail))
+    return trail
 
 
 @app.post("/api/trails", response_model=Trail)
 async def create_trail(
         trail: TrailCreate,
         current_user=Depends(get_current_user),
-        db: pyodbc.Connection = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """Create a new trail (authenticated)"""
-    cursor = db.cursor()
-
-    # Execute the stored procedure
-    cursor.execute("""
+    # Execute the stored procedure, which returns the newly created trail
+    result = await db.execute(text("""
         EXEC CW1.AddNewTrail 
-        @TrailName = ?, 
-        @Description = ?, 
-        @DateCreated = ?, 
-        @CreatedBy = ?
-    """, trail.TrailName, trail.Description, datetime.now(), current_user["user_id"])
+        @TrailName = :trail_name, 
+        @Description = :description, 
+        @DateCreated = :date_created, 
+        @CreatedBy = :created_by
+    """), {
+        "trail_name": trail.TrailName,
+        "description": trail.Description,
+        "date_created": datetime.now(),
+        "created_by": current_user["user_id"]
+    })
+    new_trail = row_to_dict(result)
 
-    db.commit()
+    await db.commit()
 
-    # Get the newly created trail
-    cursor.execute("SELECT TOP 1 * FROM CW1.Trail ORDER BY TrailID DESC")
-    new_trail = cursor.fetchone()
-    return dict(zip([column[0] for column in cursor.description], new_trail))
+    return new_trail
 
 
 @app.put("/api/trails/{trail_id}", response_model=Trail)
@@ -237,57 +281,51 @@ async def update_trail(
         trail_id: int,
         trail: TrailCreate,
         current_user=Depends(get_current_user),
-        db: pyodbc.Connection = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """Update a trail (authenticated)"""
-    cursor = db.cursor()
-
-    # Check if trail exists and user has permission
-    cursor.execute("SELECT CreatedBy FROM CW1.Trail WHERE TrailID = ?", trail_id)
-    existing_trail = cursor.fetchone()
-
-    if not existing_trail:
-        raise HTTPException(status_code=404, detail="Trail not found")
-    if existing_trail.CreatedBy != current_user["user_id"]:
-        raise HTTPException(status_code=403, detail="Not authorized to update this trail")
+    # Execute the stored procedure, which checks the trail exists and belongs
+    # to the user, then returns the updated trail
+    try:
+        result = await db.execute(text("""
+            EXEC CW1.UpdateTrail 
+            @TrailID = :trail_id, 
+            @TrailName = :trail_name, 
+            @Description = :description, 
+            @UserID = :user_id
+        """), {
+            "trail_id": trail_id,
+            "trail_name": trail.TrailName,
+            "description": trail.Description,
+            "user_id": current_user["user_id"]
+        })
+    except DBAPIError as e:
+        raise_for_trail_error(e, "update")
 
-    # Execute the stored procedure
-    cursor.execute("""
-        EXEC CW1.UpdateTrail 
-        @TrailID = ?, 
-        @TrailName = ?, 
-        @Description = ?
-    """, trail_id, trail.TrailName, trail.Description)
+    updated_trail = row_to_dict(result)
 
-    db.commit()
+    await db.commit()
 
-    # Get the updated trail
-    cursor.execute("SELECT * FROM CW1.Trail WHERE TrailID = ?", trail_id)
-    updated_trail = cursor.fetchone()
-    return dict(zip([column[0] for column in cursor.description], updated_trail))
+    return updated_trail
 
 
 @app.delete("/api/trails/{trail_id}")
 async def delete_trail(
         trail_id: int,
         current_user=Depends(get_current_user),
-        db: pyodbc.Connection = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """Delete a trail (authenticated)"""
-    cursor = db.cursor()
-
-    # Check if trail exists and user has permission
-    cursor.execute("SELECT CreatedBy FROM CW1.Trail WHERE TrailID = ?", trail_id)
-    existing_trail = cursor.fetchone()
-
-    if not existing_trail:
-        raise HTTPException(status_code=404, detail="Trail not found")
-    if existing_trail.CreatedBy != current_user["user_id"]:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this trail")
-
-    # Execute the stored procedure
-    cursor.execute("EXEC CW1.DeleteTrail @TrailID = ?", trail_id)
-    db.commit()
+    # Execute the stored procedure, which checks the trail exists and belongs
+    # to the user before deleting it
+    try:
+        await db.execute(
+            text("EXEC CW1.DeleteTrail @TrailID = :trail_id, @UserID = :user_id"),
+            {"trail_id": trail_id, "user_id": current_user["user_id"]}
+        )
+    except DBAPIError as e:
+        raise_for_trail_error(e, "delete")
+    await db.commit()
 
     return {"message": "Trail deleted successfully"}
 
@@ -297,25 +335,46 @@ async def delete_trail(
 async def get_user_trails(
         user_id: int,
         current_user=Depends(get_current_user),
-        db: pyodbc.Connection = Depends(get_db)
+        db: AsyncSession = Depends(get_db)
 ):
     """Get all trails for a specific user"""
     if current_user["user_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view these trails")
 
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT t.* 
+    result = await db.execute(text("""
+        SELECT t.TrailID, t.TrailName, t.Description, t.DateCreated, t.CreatedBy
         FROM CW1.Trail t
         JOIN CW1.UserTrail ut ON t.TrailID = ut.TrailID
-        WHERE ut.UserID = ?
-    """, user_id)
+        WHERE ut.UserID = :user_id
+    """), {"user_id": user_id})
 
-    trails = cursor.fetchall()
-    return [dict(zip([column[0] for column in cursor.description], trail)) for trail in trails]
+    return rows_to_dicts(result)
 
 
 if __name__ == "__main__":
+    import os
+    import shutil
+    import tempfile
     import uvicorn
 
-    uvicorn.run(app, port=3000)
+    workers = os.cpu_count() or 1
+
+    if workers > 1:
+        # Workers share Prometheus metrics through files in this directory. It
+        # must be set before the workers import prometheus_client, and emptied
+        # so samples from a previous run are not reported again.
+        metrics_dir = os.environ.setdefault(
+            "PROMETHEUS_MULTIPROC_DIR",
+            os.path.join(tempfile.gettempdir(), "trail-service-metrics")
+        )
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+
+    # One worker per core; "auto" picks uvloop and httptools when installed
+    uvicorn.run(
+        "main:app",
+        port=3000,
+        workers=workers,
+        loop="auto",
+        http="auto"
+    )
@@ -0,0 +1,12 @@
+# metrics.py
+from prometheus_client import Histogram
+
+# Latency of the operations on the request hot path, labelled by operation
+# ("plymouth_verify", "jwt_decode", "db_execute"). Histograms aggregate across
+# workers under MultiProcessCollector without extra options (unlike gauges,
+# which would need a multiprocess_mode), so this works with PROMETHEUS_MULTIPROC_DIR.
+TIMER = Histogram(
+    "trail_service_operation_seconds",
+    "Time spent in instrumented operations",
+    ["operation"]
+)
@@ -1,54 +1,73 @@
 # user_service.py
+import threading
+from cachetools import TTLCache
 from fastapi import HTTPException, status
-import pyodbc
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, Dict
 
+# Users looked up by email, so authenticated requests skip the User query
+_user_cache = TTLCache(maxsize=2048, ttl=300)
+_user_cache_lock = threading.Lock()
+
 
 class UserService:
     @staticmethod
-    async def get_user_by_email(conn: pyodbc.Connection, email: str) -> Optional[Dict]:
+    def get_cached_user(email: str) -> Optional[Dict]:
+        """Get user from the in-memory cache without touching the database"""
+        with _user_cache_lock:
+            return _user_cache.get(email)
+
+    @staticmethod
+    async def get_user_by_email(session: AsyncSession, email: str) -> Optional[Dict]:
         """Get user from database by email"""
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT UserID, Name, Email FROM CW1.[User] WHERE Email = ?",
-            email
+        user = UserService.get_cached_user(email)
+        if user is not None:
+            return user
+
+        result = await session.execute(
+            text("SELECT UserID, Name, Email FROM CW1.[User] WHERE Email = :email"),
+            {"email": email}
         )
-        row = cursor.fetchone()
+        row = result.first()
         if row:
-            return {
+            user = {
                 "user_id": row[0],
                 "name": row[1],
                 "email": row[2]
             }
+            with _user_cache_lock:
+                _user_cache[email] = user
+            return user
         return None
 
     @staticmethod
-    async def create_user(conn: pyodbc.Connection, email: str, name: str) -> Dict:
+    async def create_user(session: AsyncSession, email: str, name: str) -> Dict:
         """Create new user in database"""
-        cursor = conn.cursor()
-        try:
-            # Get the next available UserID
-            cursor.execute("SELECT MAX(UserID) FROM CW1.[User]")
-            max_id = cursor.fetchone()[0]
-            new_id = 1 if max_id is None else max_id + 1
+        with _user_cache_lock:
+            _user_cache.pop(email, None)
 
-            # Insert new user
-            cursor.execute(
-                """
-                INSERT INTO CW1.[User] (UserID, Name, Email, Password) 
-                VALUES (?, ?, ?, 'external_auth')
-                """,
-                new_id, name, email
+        try:
+            # Insert new user, letting the IDENTITY column assign the UserID
+            result = await session.execute(
+                text("""
+                INSERT INTO CW1.[User] (Name, Email, Password) 
+                OUTPUT INSERTED.UserID
+                VALUES (:name, :email, 'external_auth')
+                """),
+                {"name": name, "email": email}
             )
-            conn.commit()
+            new_id = result.scalar_one()
+            await session.commit()
 
             return {
                 "user_id": new_id,
                 "name": name,
                 "email": email
             }
-        except pyodbc.Error as e:
-            conn.rollback()
+        except SQLAlchemyError as e:
+            await session.rollback()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating user: {str(e)}"
@@ -56,16 +75,16 @@ class UserService:
 
     @staticmethod
     async def get_or_create_user(
-            conn: pyodbc.Connection,
+            session: AsyncSession,
             email: str,
             extract_name_from_email: bool = True
     ) -> Dict:
         """Get existing user or create new one"""
-        user = await UserService.get_user_by_email(conn, email)
+        user = await UserService.get_user_by_email(session, email)
 
         if user is None:
             # Extract name from email for new users
             name = email.split('@')[0] if extract_name_from_email else email
-            user = await UserService.create_user(conn, email, name)
+            user = await UserService.create_user(session, email, name)
 
         return user
@@ -31,7 +31,7 @@ CREATE SCHEMA CW1;
 GO
 
 CREATE TABLE CW1.[User] (
-    UserID INT PRIMARY KEY,
+    UserID INT IDENTITY(1,1) PRIMARY KEY,
     Name VARCHAR(100) NOT NULL,
     Email VARCHAR(150) UNIQUE NOT NULL,
     Password VARCHAR(255) NOT NULL
@@ -39,7 +39,7 @@ CREATE TABLE CW1.[User] (
 
 -- Create Trail Table under CW1 schema
 CREATE TABLE CW1.Trail (
-    TrailID INT PRIMARY KEY,
+    TrailID INT IDENTITY(1,1) PRIMARY KEY,
     TrailName VARCHAR(150) NOT NULL,
     Description TEXT,
     DateCreated DATE NOT NULL,
@@ -56,19 +56,26 @@ CREATE TABLE CW1.UserTrail (
     FOREIGN KEY (TrailID) REFERENCES CW1.Trail(TrailID)
 );
 
+-- Index the user side of UserTrail so per-user trail lookups seek instead of scan
+CREATE NONCLUSTERED INDEX IX_UserTrail_UserID ON CW1.UserTrail(UserID) INCLUDE (TrailID);
 
--- Insert data into User table
+
+-- Insert data into User table (explicit IDs for the seed rows only)
+SET IDENTITY_INSERT CW1.[User] ON;
 INSERT INTO CW1.[User] (UserID, Name, Email, Password) VALUES
 (1, 'John Doe', 'john@example.com', 'password123'),
 (2, 'Jane Smith', 'jane@example.com', 'securepass'),
 (3, 'Grace Hopper', 'grace@plymouth.ac.uk', 'ISAD123!'),
 (4, 'Tim Berners-Lee', 'tim@plymouth.ac.uk', 'COMP2001!'),
 (5, 'Ada Lovelace', 'ada@plymouth.ac.uk', 'insecurePassword');
+SET IDENTITY_INSERT CW1.[User] OFF;
 
--- Insert data into Trail table
+-- Insert data into Trail table (explicit IDs for the seed rows only)
+SET IDENTITY_INSERT CW1.Trail ON;
 INSERT INTO CW1.Trail (TrailID, TrailName, Description, DateCreated, CreatedBy) VALUES
 (1, 'Plymbridge Trail', 'A scenic trail through Plymbridge woods.', '2024-01-15', 1),
 (2, 'Waterfront Trail', 'Trail along the waterfront area.', '2024-02-10', 2);
+SET IDENTITY_INSERT CW1.Trail OFF;
 
 -- Insert data into UserTrail table
 INSERT INTO CW1.UserTrail (UserTrailID, UserID, TrailID) VALUES
@@ -122,7 +129,6 @@ GO
 
 
 CREATE PROCEDURE CW1.AddNewTrail(
-    @TrailID INT,
     @TrailName VARCHAR(150),
     @Description TEXT,
     @DateCreated DATE,
@@ -130,8 +136,25 @@ CREATE PROCEDURE CW1.AddNewTrail(
 )
 AS
 BEGIN
-    INSERT INTO CW1.Trail (TrailID, TrailName, Description, DateCreated, CreatedBy)
-    VALUES (@TrailID, @TrailName, @Description, @DateCreated, @CreatedBy);
+    SET NOCOUNT ON;
+
+    -- CW1.Trail has an insert trigger, so OUTPUT must go INTO a table variable
+    DECLARE @Inserted TABLE (
+        TrailID INT,
+        TrailName VARCHAR(150),
+        Description VARCHAR(MAX),
+        DateCreated DATE,
+        CreatedBy INT
+    );
+
+    INSERT INTO CW1.Trail (TrailName, Description, DateCreated, CreatedBy)
+    OUTPUT INSERTED.TrailID, INSERTED.TrailName, INSERTED.Description,
+           INSERTED.DateCreated, INSERTED.CreatedBy
+    INTO @Inserted
+    VALUES (@TrailName, @Description, @DateCreated, @CreatedBy);
+
+    -- Return the new trail so callers do not need a second query
+    SELECT TrailID, TrailName, Description, DateCreated, CreatedBy FROM @Inserted;
 END;
 
 GO
@@ -151,12 +174,27 @@ GO
 CREATE PROCEDURE CW1.UpdateTrail(
     @TrailID INT,
     @TrailName VARCHAR(150),
-    @Description TEXT
+    @Description TEXT,
+    @UserID INT
 )
 AS
 BEGIN
+    SET NOCOUNT ON;
+
+    -- Check existence and ownership here, locking the row until the update
+    DECLARE @CreatedBy INT;
+    SELECT @CreatedBy = CreatedBy FROM CW1.Trail WITH (UPDLOCK) WHERE TrailID = @TrailID;
+
+    IF @CreatedBy IS NULL
+        THROW 50404, 'Trail not found', 1;
+    IF @CreatedBy <> @UserID
+        THROW 50403, 'Not authorized to modify this trail', 1;
+
+    -- Return the updated trail so callers do not need a second query
     UPDATE CW1.Trail
     SET TrailName = @TrailName, Description = @Description
+    OUTPUT INSERTED.TrailID, INSERTED.TrailName, INSERTED.Description,
+           INSERTED.DateCreated, INSERTED.CreatedBy
     WHERE TrailID = @TrailID;
 END;
 
@@ -164,9 +202,23 @@ GO
 -- Delete Procedure:
 
 
-CREATE PROCEDURE CW1.DeleteTrail(@TrailID INT)
+CREATE PROCEDURE CW1.DeleteTrail(
+    @TrailID INT,
+    @UserID INT
+)
 AS
 BEGIN
+    SET NOCOUNT ON;
+
+    -- Check existence and ownership here, locking the row until the delete
+    DECLARE @CreatedBy INT;
+    SELECT @CreatedBy = CreatedBy FROM CW1.Trail WITH (UPDLOCK) WHERE TrailID = @TrailID;
+
+    IF @CreatedBy IS NULL
+        THROW 50404, 'Trail not found', 1;
+    IF @CreatedBy <> @UserID
+        THROW 50403, 'Not authorized to modify this trail', 1;
+
     DELETE FROM CW1.Trail WHERE TrailID = @TrailID;
 END;
 
@@ -179,7 +231,6 @@ GO
 
 -- Add a new trail using the AddNewTrail procedure
 EXEC CW1.AddNewTrail
-    @TrailID = 3,
     @TrailName = 'Mountain View Trail',
     @Description = 'A challenging trail with beautiful mountain views.',
     @DateCreated = '2024-04-01',
@@ -205,7 +256,8 @@ GO
 EXEC CW1.UpdateTrail
     @TrailID = 1,
     @TrailName = 'Updated Plymbridge Trail',
-    @Description = 'An updated scenic trail through Plymbridge woods.';
+    @Description = 'An updated scenic trail through Plymbridge woods.',
+    @UserID = 1;
 
 GO
 
@@ -219,7 +271,7 @@ SELECT * FROM CW1.Trail;
 GO
 
 -- Delete a trail using the DeleteTrail procedure
-EXEC CW1.DeleteTrail @TrailID = 3;
+EXEC CW1.DeleteTrail @TrailID = 3, @UserID = 1;
 GO
 
 -- Verify the trail was deleted
@@ -249,8 +301,8 @@ END;
 GO
 
 -- Insert a new trail to test the trigger
-INSERT INTO CW1.Trail (TrailID, TrailName, Description, DateCreated, CreatedBy)
-VALUES (3, 'Forest Trail', 'A trail through the forest.', '2024-03-01', 1);
+INSERT INTO CW1.Trail (TrailName, Description, DateCreated, CreatedBy)
+VALUES ('Forest Trail', 'A trail through the forest.', '2024-03-01', 1);
 GO
 
 -- Verify the log
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app modules import each other as top-level modules (e.g. "from config
+# import get_settings"), so app/ must be importable alongside the app package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
@@ -1,9 +1,12 @@
+import asyncio
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime
+from sqlalchemy.exc import DBAPIError
 
-from app.main import app
+from app.main import app, get_current_user, raise_for_trail_error
 from app.config import get_settings, Settings
 from app.auth_service import AuthUtils
 
@@ -152,3 +155,56 @@ def test_invalid_trail_id(app_client, mock_db, auth_headers):
     )
 
     assert response.status_code == 404
+
+
+
+@pytest.mark.parametrize("message, status_code", [
+    ("[42000] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]Trail not found (50404) (SQLExecDirectW)", 404),
+    ("Trail not found", 404),
+    ("[42000] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]"
+     "Not authorized to modify this trail (50403) (SQLExecDirectW)", 403),
+    ("Not authorized to modify this trail", 403),
+])
+def test_trail_procedure_errors_mapped(message, status_code):
+    """Test THROWs from the trail procedures map to 404/403"""
+    error = DBAPIError("EXEC CW1.UpdateTrail", {}, Exception("42000", message))
+
+    with pytest.raises(HTTPException) as exc_info:
+        raise_for_trail_error(error, "update")
+
+    assert exc_info.value.status_code == status_code
+
+
+def test_other_trail_procedure_errors_reraised():
+    """Test unrelated database errors are re-raised unchanged"""
+    error = DBAPIError("EXEC CW1.DeleteTrail", {}, Exception("08S01", "Communication link failure"))
+
+    with pytest.raises(DBAPIError) as exc_info:
+        raise_for_trail_error(error, "delete")
+
+    assert exc_info.value is error
+
+
+def test_current_user_cache_hit_skips_db():
+    """Test a cached user is returned without opening a DB session"""
+    token = AuthUtils.create_access_token(data={"sub": "fast@plymouth.ac.uk", "user_id": 7})
+    cached_user = {"user_id": 7, "name": "fast", "email": "fast@plymouth.ac.uk"}
+
+    with patch('app.main.UserService.get_cached_user', return_value=cached_user), \
+            patch('app.main.async_session_maker') as session_maker:
+        assert asyncio.run(get_current_user(token)) == cached_user
+
+    session_maker.assert_not_called()
+
+
+def test_current_user_cache_miss_uses_db():
+    """Test an uncached user is looked up through a new DB session"""
+    token = AuthUtils.create_access_token(data={"sub": "slow@plymouth.ac.uk", "user_id": 8})
+    db_user = {"user_id": 8, "name": "slow", "email": "slow@plymouth.ac.uk"}
+
+    with patch('app.main.UserService.get_cached_user', return_value=None), \
+            patch('app.main.UserService.get_user_by_email', AsyncMock(return_value=db_user)), \
+            patch('app.main.async_session_maker') as session_maker:
+        assert asyncio.run(get_current_user(token)) == db_user
+
+    session_maker.assert_called_once()
@@ -0,0 +1,104 @@
+import asyncio
+import httpx
+import pytest
+import time
+from fastapi import HTTPException
+from tenacity import wait_none
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from app.auth_service import AuthUtils, CircuitBreaker
+
+
+def test_decode_token_cached():
+    """Test repeated token decodes are served from the cache"""
+    token = AuthUtils.create_access_token(
+        data={"sub": "test@plymouth.ac.uk", "user_id": 1}
+    )
+    payload = AuthUtils.decode_token(token)
+
+    with patch('app.auth_service.jwt.decode') as mock_decode:
+        assert AuthUtils.decode_token(token) == payload
+        mock_decode.assert_not_called()
+
+
+def test_verified_credentials_cached():
+    """Test repeated logins skip the Plymouth call once verified"""
+    response = MagicMock(status_code=200)
+    response.json.return_value = ["Verified", "True"]
+    client = MagicMock()
+    client.post = AsyncMock(return_value=response)
+
+    with patch.object(AuthUtils, '_client', client):
+        for _ in range(2):
+            assert asyncio.run(
+                AuthUtils.verify_plymouth_credentials("cached@plymouth.ac.uk", "password")
+            )
+
+    client.post.assert_awaited_once()
+
+
+def test_plymouth_breaker_opens_after_failures():
+    """Test Plymouth logins fail fast once the circuit breaker opens"""
+    client = MagicMock()
+    client.post = AsyncMock(side_effect=httpx.ConnectError("unreachable"))
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=30)
+
+    with patch.object(AuthUtils, '_client', client), \
+            patch('app.auth_service.plymouth_breaker', breaker), \
+            patch.object(AuthUtils._post_credentials.retry, 'wait', wait_none()):
+        for attempt in range(3):
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(
+                    AuthUtils.verify_plymouth_credentials(f"down{attempt}@plymouth.ac.uk", "password")
+                )
+            assert exc_info.value.status_code == 503
+
+    # Two calls of three attempts each, then the open breaker short-circuits
+    assert client.post.await_count == 6
+    assert breaker.is_open
+
+
+def test_half_open_breaker_allows_single_probe():
+    """Test only one call probes the service after the reset timeout"""
+    breaker = CircuitBreaker(fail_max=1, reset_timeout=30)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    with patch('app.auth_service.time.monotonic', return_value=time.monotonic() + 31):
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        # A failed probe re-opens the breaker for another reset_timeout
+        breaker.record_failure()
+        assert not breaker.allow_request()
+
+
+def test_half_open_breaker_closes_on_successful_probe():
+    """Test a successful probe closes the breaker for every caller"""
+    breaker = CircuitBreaker(fail_max=1, reset_timeout=30)
+    breaker.record_failure()
+
+    with patch('app.auth_service.time.monotonic', return_value=time.monotonic() + 31):
+        assert breaker.allow_request()
+        breaker.record_success()
+
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+
+
+def test_breaker_rechecked_after_bulkhead():
+    """Test calls queued on the bulkhead are rejected if the breaker opened meanwhile"""
+    client = MagicMock()
+    client.post = AsyncMock()
+    breaker = MagicMock(is_open=False)
+    breaker.allow_request.return_value = False
+
+    with patch.object(AuthUtils, '_client', client), \
+            patch('app.auth_service.plymouth_breaker', breaker):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(
+                AuthUtils.verify_plymouth_credentials("queued@plymouth.ac.uk", "password")
+            )
+
+    assert exc_info.value.status_code == 503
+    client.post.assert_not_called()
@@ -0,0 +1,46 @@
+import asyncio
+from unittest.mock import MagicMock, AsyncMock
+
+from app.user_service import UserService
+
+
+def mock_session(row):
+    """Session whose execute() returns a result with the given first row"""
+    result = MagicMock()
+    result.first.return_value = row
+    result.scalar_one.return_value = row[0] if row else None
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.commit = AsyncMock()
+    return session
+
+
+def test_user_lookup_cached():
+    """Test repeated lookups of the same email skip the database"""
+    session = mock_session((1, "Cached User", "cached@plymouth.ac.uk"))
+
+    first = asyncio.run(UserService.get_user_by_email(session, "cached@plymouth.ac.uk"))
+    second = asyncio.run(UserService.get_user_by_email(session, "cached@plymouth.ac.uk"))
+
+    assert first == second == {"user_id": 1, "name": "Cached User", "email": "cached@plymouth.ac.uk"}
+    session.execute.assert_awaited_once()
+    assert UserService.get_cached_user("cached@plymouth.ac.uk") == first
+
+
+def test_missing_user_not_cached():
+    """Test lookups that find no user are not cached"""
+    session = mock_session(None)
+
+    assert asyncio.run(UserService.get_user_by_email(session, "missing@plymouth.ac.uk")) is None
+    assert UserService.get_cached_user("missing@plymouth.ac.uk") is None
+
+
+def test_create_user_invalidates_cache():
+    """Test creating a user drops any cached entry for that email"""
+    email = "recreated@plymouth.ac.uk"
+    asyncio.run(UserService.get_user_by_email(mock_session((1, "Old Name", email)), email))
+    assert UserService.get_cached_user(email) is not None
+
+    asyncio.run(UserService.create_user(mock_session((2,)), email, "New Name"))
+
+    assert UserService.get_cached_user(email) is None